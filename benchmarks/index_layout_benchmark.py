@@ -0,0 +1,129 @@
+"""
+Compares the per-doc FAISS layout with the shared multi-document index.
+
+Builds synthetic documents with fake embeddings (no model download, no Supabase) and reports
+file count, size on disk, cold-load time, memory and query latency for both layouts.
+
+FakeEmbeddings pickles to almost nothing, so the size, memory and cold-load numbers leave out the
+embedding model. Baseline per-doc stores pickle a full HuggingFace model each, so in production the
+per-doc layout is much larger and slower to load than shown here. Compare the layouts relative to
+each other; don't read the numbers as production figures.
+
+Usage:
+    python benchmarks/index_layout_benchmark.py --docs 1000 --chunks 20 --queries 200
+"""
+import os
+import sys
+import time
+import pickle
+import random
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from scraper.shared_index import SharedVectorIndex
+
+EMBEDDING_SIZE = 384  # Same dimension as all-MiniLM-L6-v2
+
+def make_chunks(doc_id: str, count: int):
+    return [Document(page_content=f"{doc_id} chunk {i} " + "lorem ipsum " * 50, metadata={"doc_id": doc_id}) for i in range(count)]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def timed_queries(search, doc_ids, queries, docs_per_query):
+    latencies = []
+    for i in range(queries):
+        targets = random.sample(doc_ids, docs_per_query)
+        start = time.perf_counter()
+        search(f"question {i}", targets)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def load_with_memory(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = load()
+    elapsed = time.perf_counter() - start
+    python_heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return loaded, elapsed, python_heap
+
+def dir_size(path):
+    files = [os.path.join(path, name) for name in os.listdir(path)]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+def report(name, files, size, load_seconds, python_heap, vectors, single, multi):
+    print(f"\n=== {name} ===")
+    print(f"files on disk:        {files}")
+    print(f"size on disk:         {size / 1e6:.1f} MB")
+    print(f"cold load:            {load_seconds:.2f} s")
+    print(f"python heap:          {python_heap / 1e6:.1f} MB (+{vectors * EMBEDDING_SIZE * 4 / 1e6:.1f} MB FAISS vectors)")
+    print(f"1-doc query p50/p95:  {statistics.median(single):.2f} / {percentile(single, 0.95):.2f} ms")
+    print(f"5-doc query p50/p95:  {statistics.median(multi):.2f} / {percentile(multi, 0.95):.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    embeddings = FakeEmbeddings(size=EMBEDDING_SIZE)
+    doc_ids = [f"doc-{i}" for i in range(args.docs)]
+    vectors = args.docs * args.chunks
+
+    with tempfile.TemporaryDirectory() as per_doc_dir, tempfile.TemporaryDirectory() as shared_dir:
+        print("[BENCH] Using FakeEmbeddings: size, memory and cold-load numbers exclude the embedding model.")
+        print(f"[BENCH] Building {args.docs} documents x {args.chunks} chunks...")
+        shared = SharedVectorIndex(embeddings)
+        for doc_id in doc_ids:
+            chunks = make_chunks(doc_id, args.chunks)
+            with open(os.path.join(per_doc_dir, f"{doc_id}.pkl"), 'wb') as f:
+                pickle.dump(FAISS.from_documents(chunks, embeddings), f)
+            shared.add_document(doc_id, chunks)
+        with open(os.path.join(shared_dir, "shared_index.pkl"), 'wb') as f:
+            pickle.dump(shared, f)
+        del shared
+
+        # --- Per-doc layout: one store per document ---
+        def load_per_doc():
+            stores = {}
+            for filename in os.listdir(per_doc_dir):
+                with open(os.path.join(per_doc_dir, filename), 'rb') as f:
+                    stores[filename.split('.')[0]] = pickle.load(f)
+            return stores
+        stores, load_seconds, python_heap = load_with_memory(load_per_doc)
+
+        def search_per_doc(question, targets, k=4):
+            scored = []
+            for target in targets:
+                scored.extend(stores[target].similarity_search_with_score(question, k=k))
+            return sorted(scored, key=lambda pair: pair[1])[:k]
+        files, size = dir_size(per_doc_dir)
+        report("per-doc", files, size, load_seconds, python_heap, vectors,
+               timed_queries(search_per_doc, doc_ids, args.queries, 1),
+               timed_queries(search_per_doc, doc_ids, args.queries, min(5, args.docs)))
+        del stores
+
+        # --- Shared layout: one store filtered by doc_id ---
+        def load_shared():
+            with open(os.path.join(shared_dir, "shared_index.pkl"), 'rb') as f:
+                index = pickle.load(f)
+            index.attach_embeddings(embeddings)
+            return index
+        shared, load_seconds, python_heap = load_with_memory(load_shared)
+        files, size = dir_size(shared_dir)
+        report("shared", files, size, load_seconds, python_heap, vectors,
+               timed_queries(shared.search, doc_ids, args.queries, 1),
+               timed_queries(shared.search, doc_ids, args.queries, min(5, args.docs)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measures how fast the API starts.
+
+Prints an import-time breakdown of `import main` per top-level package (from `python -X importtime`)
+and, with --serve, the time until /healthz answers and until /readyz reports every subsystem warm.
+
+Usage:
+    python benchmarks/startup_benchmark.py --top 15
+    python benchmarks/startup_benchmark.py --serve --port 8010
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_breakdown(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr.splitlines()[-1] if result.stderr else "[BENCH_ERROR] import main failed")
+        sys.exit(1)
+
+    # Summing self time per package attributes every microsecond exactly once.
+    self_time = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        package = name.strip().split(".")[0]
+        self_time[package] += int(own)
+        if name.strip() == "main":
+            total = int(cumulative)
+
+    print(f"=== import main: {total / 1000:.1f} ms ===")
+    for package, micros in sorted(self_time.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{package:<30} {micros / 1000:8.1f} ms")
+
+def wait_for(url: str, deadline: float) -> bool:
+    """Polls url until it answers 200 or the deadline passes."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    return False
+
+def serve_timings(port: int, timeout: float):
+    start = time.perf_counter()
+    deadline = start + timeout
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+    )
+    try:
+        print("\n=== server (from process start) ===")
+        for probe in ("healthz", "readyz"):
+            if wait_for(f"http://127.0.0.1:{port}/{probe}", deadline):
+                print(f"/{probe} ok after: {time.perf_counter() - start:.2f} s")
+            else:
+                print(f"/{probe} not ok within {timeout:.0f} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to show")
+    parser.add_argument("--serve", action="store_true", help="Also time /healthz and /readyz on a live server")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    import_breakdown(args.top)
+    if args.serve:
+        serve_timings(args.port, args.timeout)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # config.py
 import os
+import threading
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 # Load variables from the .env file
 load_dotenv()
@@ -12,5 +12,14 @@ key: str = os.environ.get("SUPABASE_KEY")
 if not url or not key:
     raise EnvironmentError("Supabase URL and Key must be set in the .env file")
 
-# Initialize the Supabase client
-supabase: Client = create_client(url, key)
\ No newline at end of file
+_supabase = None
+_supabase_lock = threading.Lock()
+
+def get_supabase():
+    """Creates the Supabase client on first use, so importing config stays fast."""
+    global _supabase
+    with _supabase_lock:
+        if _supabase is None:
+            from supabase import create_client
+            _supabase = create_client(url, key)
+    return _supabase
\ No newline at end of file
@@ -1,15 +1,19 @@
 import uuid
+import time
 import datetime
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, HttpUrl
 from typing import List, Optional
 
-from scraper.scraper_manager import scrape_and_process_site
-from scraper.supabase_manager import get_all_sessions, update_conversation
-from scraper.rag_handler import ask_question
+from scraper.scraper_manager import scrape_and_process_site, remove_site
+from scraper.supabase_manager import get_all_sessions, update_conversation, ping_database
+from scraper.rag_handler import ask_question, warm_up as warm_up_rag
+from scraper.suggestions import get_suggestions, get_instant_answer, live_question
 from fastapi.middleware.cors import CORSMiddleware
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import random
 import uvicorn
 
@@ -109,11 +113,65 @@ AFFIRMATION_RESPONSES = [
     "Perfect! Let's proceed.",
 ]
 
-# ---------------------- FastAPI SETUP ----------------------
+# ---------------------- LAZY SUBSYSTEMS ----------------------
+
+_analyzer = None
+
+def get_sentiment_analyzer():
+    """Loads the VADER lexicon on first use instead of at import time."""
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+def check_storage():
+    if not ping_database():
+        raise ConnectionError("Supabase is not reachable")
+
+# Warm-up state of each subsystem: 'pending', 'ready' or 'failed: <reason>'. Reported by /readyz.
+WARMUP_STATUS = {"storage": "pending", "sentiment": "pending", "rag": "pending"}
 
-analyzer = SentimentIntensityAnalyzer()
+WARMUP_STEPS = {"storage": check_storage, "sentiment": get_sentiment_analyzer, "rag": warm_up_rag}
+WARMUP_MAX_BACKOFF = 60  # seconds
+
+def run_warmup_step(name: str) -> bool:
+    start = time.perf_counter()
+    try:
+        WARMUP_STEPS[name]()
+        WARMUP_STATUS[name] = "ready"
+        print(f"[STARTUP] {name} warmed up in {time.perf_counter() - start:.2f}s.")
+        return True
+    except Exception as e:
+        WARMUP_STATUS[name] = f"failed: {e}"
+        print(f"[STARTUP_ERROR] Failed to warm up {name}: {e}")
+        return False
+
+def warm_up_subsystems():
+    """
+    Loads the database client, sentiment lexicon, embedding model and shared index in the background,
+    retrying failed steps with exponential backoff until every subsystem is warm.
+    """
+    backoff = 1
+    while True:
+        pending = [name for name, status in WARMUP_STATUS.items() if status != "ready"]
+        if not pending:
+            return
+        for name in pending:
+            run_warmup_step(name)
+        if any(WARMUP_STATUS[name] != "ready" for name in pending):
+            time.sleep(backoff)
+            backoff = min(backoff * 2, WARMUP_MAX_BACKOFF)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving immediately; heavy models and stores load on a background thread.
+    threading.Thread(target=warm_up_subsystems, name="warm-up", daemon=True).start()
+    yield
+
+# ---------------------- FastAPI SETUP ----------------------
 
-app = FastAPI(title="Web Scraper & Chat API")
+app = FastAPI(title="Web Scraper & Chat API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -130,6 +188,7 @@ class ChatRequest(BaseModel):
     doc_id: str
     question: str
     history: List[str]
+    doc_ids: Optional[List[str]] = None  # Optional set of documents to answer from instead of doc_id
 class DocumentInfo(BaseModel): website_url: Optional[str] = None
 class SessionInfo(BaseModel):
     session_id: uuid.UUID
@@ -142,11 +201,32 @@ class ScrapeResponse(BaseModel):
     status: str
     message: str
 class ChatResponse(BaseModel): answer: str
+class SuggestionInfo(BaseModel):
+    question: str
+    ready: bool
 
 @app.get("/", summary="API Health Check")
 async def root():
     return {"message": "API is running. Use /docs for API documentation."}
 
+@app.get("/healthz", summary="Liveness probe")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz", summary="Readiness probe: models and storage are warm")
+async def readyz():
+    # Only reads the warm-up state; retries (and their blocking calls) stay on the warm-up thread.
+    if all(status == "ready" for status in WARMUP_STATUS.values()):
+        status = "ready"
+    elif any(status.startswith("failed") for status in WARMUP_STATUS.values()):
+        status = "failed"
+    else:
+        status = "warming_up"
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={"status": status, "components": WARMUP_STATUS},
+    )
+
 # --- API Endpoints ---
 @app.get("/sessions", summary="Get all chat sessions", response_model=List[SessionInfo])
 async def fetch_sessions_endpoint():
@@ -167,6 +247,24 @@ async def scrape_endpoint(req: ScrapeRequest, background_tasks: BackgroundTasks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start task: {e}")
 
+@app.delete("/documents/{doc_id}", summary="Delete a scraped site and its sessions", response_model=ScrapeResponse)
+async def delete_document_endpoint(doc_id: str):
+    try:
+        if not remove_site(doc_id):
+            raise HTTPException(status_code=500, detail="Failed to delete the document from the database.")
+        return {"status": "success", "message": f"Document {doc_id} deleted."}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete document: {e}")
+
+@app.get("/documents/{doc_id}/suggestions", summary="Get suggested questions for a document", response_model=List[SuggestionInfo])
+async def suggestions_endpoint(doc_id: str):
+    try:
+        return get_suggestions(doc_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch suggestions: {e}")
+
 # ==============================================================================
 
 @app.post("/chat", summary="Ask a question and save conversation", response_model=ChatResponse)
@@ -175,8 +273,13 @@ async def chat_endpoint(req: ChatRequest):
         question = req.question.lower().strip().rstrip("?!.")
         final_answer = ""
 
+        # --- Precomputed answers to suggested questions skip the RAG pipeline entirely ---
+        instant_answer = None if req.doc_ids else get_instant_answer(req.doc_id, req.question)
+
         # --- Check all intents ---
-        if question in GREETINGS:
+        if instant_answer:
+            final_answer = instant_answer
+        elif question in GREETINGS:
             final_answer = random.choice(GREETING_RESPONSES)
         elif question in NEGATIONS:
             final_answer = random.choice(NEGATION_RESPONSES)
@@ -190,18 +293,20 @@ async def chat_endpoint(req: ChatRequest):
             final_answer = "I sense some emotion there! 😊 How can I assist you further?"
         elif any(word in question for word in QUESTIONS):
             # For general questions, go to RAG
-            rag_answer = ask_question(doc_id=req.doc_id, question=req.question, history=req.history)
+            with live_question():
+                rag_answer = ask_question(doc_id=req.doc_id, question=req.question, history=req.history, doc_ids=req.doc_ids)
             final_answer = f"Here’s what I found: {rag_answer}"
         else:
             # --- Sentiment Analysis + RAG pipeline ---
-            sentiment_scores = analyzer.polarity_scores(req.question)
+            sentiment_scores = get_sentiment_analyzer().polarity_scores(req.question)
             sentiment = "neutral"
             if sentiment_scores['compound'] >= 0.05:
                 sentiment = "positive"
             elif sentiment_scores['compound'] <= -0.05:
                 sentiment = "negative"
 
-            rag_answer = ask_question(doc_id=req.doc_id, question=req.question, history=req.history)
+            with live_question():
+                rag_answer = ask_question(doc_id=req.doc_id, question=req.question, history=req.history, doc_ids=req.doc_ids)
 
             if sentiment == "positive":
                 final_answer = f"Great question! ✨ {rag_answer}"
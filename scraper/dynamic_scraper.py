@@ -1,4 +1,3 @@
-import undetected_chromedriver as uc
 import time
 
 def scrape_dynamic(url: str):
@@ -8,6 +7,9 @@ def scrape_dynamic(url: str):
     """
     print(f"[INFO] Using Undetected-Chromedriver (dynamic scraper) for: {url}")
     
+    # Imported here so the browser stack is only loaded when a page actually needs it.
+    import undetected_chromedriver as uc
+
     html = ""
     driver = None
     try:
@@ -1,60 +1,162 @@
 import os
+import copy
+import time
 import pickle
-from langchain.retrievers.multi_query import MultiQueryRetriever
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.llms.ollama import Ollama
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
-from langchain.schema.output_parser import StrOutputParser
-from config import supabase
+import threading
+from typing import TYPE_CHECKING, List, Optional
+from config import get_supabase
+
+# LangChain, sentence-transformers and FAISS are imported inside the functions that use them so that
+# importing this module stays cheap; warm_up() loads them in the background when the API starts.
+if TYPE_CHECKING:
+    from langchain.docstore.document import Document
 
 CACHE_DIR = "retriever_cache"
 os.makedirs(CACHE_DIR, exist_ok=True)
 RETRIEVER_CACHE = {}
 
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# 'per_doc' keeps one FAISS store per document; 'shared' keeps all documents in one store filtered by doc_id.
+INDEX_MODES = {"per_doc", "shared"}
+INDEX_MODE = os.environ.get("RAG_INDEX_MODE", "per_doc").strip().lower()
+
+if INDEX_MODE not in INDEX_MODES:
+    raise EnvironmentError(f"RAG_INDEX_MODE must be one of {sorted(INDEX_MODES)}, got '{INDEX_MODE}'")
+SHARED_INDEX_FILE = "shared_index.pkl"
+SHARED_INDEX = None
+
+_EMBEDDINGS = None
+_INIT_LOCK = threading.RLock()
+
+def get_embeddings():
+    """Loads the embedding model on first use and reuses it afterwards."""
+    global _EMBEDDINGS
+    with _INIT_LOCK:
+        if _EMBEDDINGS is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _EMBEDDINGS = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    return _EMBEDDINGS
+
+def load_cached_store(doc_id: str) -> bool:
+    """Loads one saved vector store from the cache directory, if it exists."""
+    path = os.path.join(CACHE_DIR, f"{doc_id}.pkl")
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, 'rb') as f:
+            vectorstore = pickle.load(f)
+        # Older cache files carry their own copy of the model; swap it for the shared one.
+        vectorstore.embedding_function = get_embeddings()
+        RETRIEVER_CACHE[doc_id] = vectorstore
+        print(f"[CACHE] Loaded vector store for doc_id {doc_id} from disk.")
+        return True
+    except Exception as e:
+        print(f"[CACHE_ERROR] Failed to load {path}: {e}")
+        return False
+
 def load_cache_from_disk():
     """Loads all saved vector stores from the cache directory into memory."""
     for filename in os.listdir(CACHE_DIR):
-        if filename.endswith(".pkl"):
+        if filename.endswith(".pkl") and filename != SHARED_INDEX_FILE:
             doc_id = filename.split('.')[0]
-            try:
-                with open(os.path.join(CACHE_DIR, filename), 'rb') as f:
-                    RETRIEVER_CACHE[doc_id] = pickle.load(f)
-                print(f"[CACHE] Loaded vector store for doc_id {doc_id} from disk.")
-            except Exception as e:
-                print(f"[CACHE_ERROR] Failed to load {filename}: {e}")
+            if doc_id not in RETRIEVER_CACHE:
+                load_cached_store(doc_id)
+
+def load_shared_index_from_disk():
+    """Loads the shared multi-document index, or starts an empty one."""
+    global SHARED_INDEX
+    from scraper.shared_index import SharedVectorIndex
+    path = os.path.join(CACHE_DIR, SHARED_INDEX_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                SHARED_INDEX = pickle.load(f)
+            SHARED_INDEX.attach_embeddings(get_embeddings())
+            print(f"[CACHE] Loaded shared vector index from disk: {SHARED_INDEX.stats()}")
+            return
+        except Exception as e:
+            # Never let the next save overwrite an index we could not read; keep it for recovery.
+            corrupt_path = f"{path}.corrupt-{int(time.time())}"
+            os.replace(path, corrupt_path)
+            print(f"[CACHE_ERROR] Failed to load {SHARED_INDEX_FILE}: {e}. Moved it to {corrupt_path}.")
+    SHARED_INDEX = SharedVectorIndex(get_embeddings())
+
+def get_shared_index():
+    """Returns the shared index, loading it from disk on first use."""
+    with _INIT_LOCK:
+        if SHARED_INDEX is None:
+            load_shared_index_from_disk()
+    return SHARED_INDEX
+
+def save_shared_index_to_disk():
+    """Persists the shared index (including tombstones) to the cache directory."""
+    get_shared_index().save(os.path.join(CACHE_DIR, SHARED_INDEX_FILE))
 
-load_cache_from_disk()
+def warm_up():
+    """
+    Loads the embedding model, the generation chain modules and, in shared mode, the shared index.
+    Per-doc stores load on demand in is_doc_indexed. Meant to run in a background thread at startup.
+    """
+    get_embeddings()
+    # Import the generation chain now so the first question doesn't pay for it.
+    from langchain_community.vectorstores import FAISS  # noqa: F401
+    from langchain_community.llms.ollama import Ollama  # noqa: F401
+    from langchain.prompts import ChatPromptTemplate  # noqa: F401
+    from langchain.schema.runnable import RunnablePassthrough  # noqa: F401
+    from langchain.schema.output_parser import StrOutputParser  # noqa: F401
+    from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: F401
+    if INDEX_MODE == "shared":
+        get_shared_index()
+
+def is_doc_indexed(doc_id: str) -> bool:
+    """Checks whether a document's vectors are available in the active index layout."""
+    if INDEX_MODE == "shared":
+        return get_shared_index().contains(doc_id)
+    return doc_id in RETRIEVER_CACHE or load_cached_store(doc_id)
+
+def load_doc_chunks(doc_id: str) -> List["Document"]:
+    """Fetches a document's scraped pages from Supabase and splits them into chunks."""
+    from langchain.docstore.document import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    response = get_supabase().table('documents').select('content').eq('doc_id', doc_id).single().execute()
+    if not response.data or not response.data.get('content'):
+        raise FileNotFoundError(f"No document content found for doc_id: {doc_id}")
+
+    data = response.data['content']
+    page_contents = [f"URL: {p.get('url','')}\nContent:\n{p.get('content','')}" for p in data.get('pages', [])]
+    full_text = "\n\n---\n\n".join(page_contents)
+    doc = Document(page_content=full_text, metadata={"source": data.get("website_url", ""), "doc_id": doc_id})
+
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+    return text_splitter.split_documents([doc])
 
 def prepare_retriever_for_doc(doc_id: str):
     """Prepares and caches the FAISS vector store and saves it to disk."""
-    if doc_id in RETRIEVER_CACHE:
+    if is_doc_indexed(doc_id):
         return True
 
     print(f"[RAG] Preparing new vector store for doc_id: {doc_id}...")
     try:
-        response = supabase.table('documents').select('content').eq('doc_id', doc_id).single().execute()
-        if not response.data or not response.data.get('content'):
-            raise FileNotFoundError(f"No document content found for doc_id: {doc_id}")
+        chunks = load_doc_chunks(doc_id)
 
-        data = response.data['content']
-        page_contents = [f"URL: {p.get('url','')}\nContent:\n{p.get('content','')}" for p in data.get('pages', [])]
-        full_text = "\n\n---\n\n".join(page_contents)
-        doc = Document(page_content=full_text, metadata={"source": data.get("website_url", "")})
+        if INDEX_MODE == "shared":
+            get_shared_index().add_document(doc_id, chunks)
+            save_shared_index_to_disk()
+            print(f"[RAG] Added doc_id {doc_id} to the shared vector index: {get_shared_index().stats()}")
+            return True
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        chunks = text_splitter.split_documents([doc])
-        
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        vectorstore = FAISS.from_documents(chunks, embeddings)
+        from langchain_community.vectorstores import FAISS
+        vectorstore = FAISS.from_documents(chunks, get_embeddings())
         
         RETRIEVER_CACHE[doc_id] = vectorstore
         
+        # Save without the embedding model; load_cached_store re-attaches the shared one.
+        stored = copy.copy(vectorstore)
+        stored.embedding_function = None
         with open(os.path.join(CACHE_DIR, f"{doc_id}.pkl"), 'wb') as f:
-            pickle.dump(vectorstore, f)
+            pickle.dump(stored, f)
         
         print(f"[RAG] Vector store for doc_id {doc_id} is ready and saved.")
         return True
@@ -62,21 +164,59 @@ def prepare_retriever_for_doc(doc_id: str):
         print(f"[RAG_ERROR] Failed to prepare vector store: {e}")
         return False
 
-def ask_question(doc_id: str, question: str, history: list) -> str:
+def delete_doc_from_index(doc_id: str):
+    """
+    Removes a document's vectors. In shared mode the document is tombstoned and the index
+    compacts itself once enough of it is dead; in per-doc mode the store file is deleted.
+    """
+    if INDEX_MODE == "shared":
+        get_shared_index().delete_document(doc_id)
+        save_shared_index_to_disk()
+        return
+
+    RETRIEVER_CACHE.pop(doc_id, None)
+    path = os.path.join(CACHE_DIR, f"{doc_id}.pkl")
+    if os.path.exists(path):
+        os.remove(path)
+
+def get_retriever(doc_ids: List[str]):
+    """Builds a retriever over one or more documents for the active index layout."""
+    if INDEX_MODE == "shared":
+        shared_index = get_shared_index()
+        return lambda question: shared_index.search(question, doc_ids)
+
+    if len(doc_ids) == 1:
+        # We use the base retriever which is much faster than the Multi-Query one.
+        return RETRIEVER_CACHE[doc_ids[0]].as_retriever()
+
+    def retrieve_across_docs(question: str, k: int = 4):
+        scored = []
+        for target in doc_ids:
+            scored.extend(RETRIEVER_CACHE[target].similarity_search_with_score(question, k=k))
+        return [doc for doc, _ in sorted(scored, key=lambda pair: pair[1])[:k]]
+    return retrieve_across_docs
+
+def ask_question(doc_id: str, question: str, history: list, doc_ids: Optional[List[str]] = None) -> str:
     """
     Asks a question using a faster, conversational RAG pipeline.
+    Pass doc_ids to answer from a set of documents instead of just doc_id.
     """
-    if doc_id not in RETRIEVER_CACHE:
-        print(f"[CACHE] Vector store for {doc_id} not in memory. Preparing now...")
-        if not prepare_retriever_for_doc(doc_id):
-            return "Sorry, I could not prepare the document for chat. The data might be missing."
+    target_doc_ids = doc_ids or [doc_id]
+    for target in target_doc_ids:
+        if not is_doc_indexed(target):
+            print(f"[CACHE] Vector store for {target} not in memory. Preparing now...")
+            if not prepare_retriever_for_doc(target):
+                return "Sorry, I could not prepare the document for chat. The data might be missing."
+
+    from langchain_community.llms.ollama import Ollama
+    from langchain.prompts import ChatPromptTemplate
+    from langchain.schema.runnable import RunnablePassthrough
+    from langchain.schema.output_parser import StrOutputParser
 
-    vectorstore = RETRIEVER_CACHE[doc_id]
     llm = Ollama(model="gemma:7b")
     
     # --- THIS IS THE NEW, FASTER RETRIEVER ---
-    # We use the base retriever which is much faster than the Multi-Query one.
-    retriever = vectorstore.as_retriever()
+    retriever = get_retriever(target_doc_ids)
 
     template = """
     You are "Athena," a friendly, enthusiastic, and highly intelligent AI assistant. Your primary goal is to provide helpful, well-structured, and engaging answers based ONLY on the context provided from a scraped website and the previous chat history.
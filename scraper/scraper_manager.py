@@ -1,4 +1,5 @@
 import os
+import re
 import json
 import uuid
 import datetime
@@ -8,16 +9,26 @@ from bs4 import BeautifulSoup
 from scraper.static_scraper import scrape_static
 from scraper.dynamic_scraper import scrape_dynamic
 from scraper.tech_detector import analyze_technology
-from scraper.supabase_manager import upsert_document, create_initial_session, update_session_status
-from scraper.rag_handler import prepare_retriever_for_doc
+from scraper.supabase_manager import upsert_document, create_initial_session, update_session_status, delete_document
+from scraper.rag_handler import prepare_retriever_for_doc, delete_doc_from_index
+from scraper.suggestions import attach_suggested_questions, invalidate_suggestions, schedule_precompute
 
 DATA_FOLDER = "data"
 
+# Selectors that usually wrap the real page content; shared by content extraction and render scoring.
+MAIN_CONTENT_SELECTORS = ['main', 'article', '#content', '#main', '.content', '.main-content']
+# Mount points used by common SPA frameworks; an empty one means the page is rendered client-side.
+SPA_ROOT_SELECTORS = ['#root', '#app', '#__next', '#__nuxt', '#svelte', '[ng-version]', 'app-root']
+# Pages scoring below this threshold are treated as empty shells and escalated to the browser.
+RENDER_SCORE_THRESHOLD = 0.5
+# A browser render only wins (and is cached for the URL pattern) if it adds this much score or text.
+RENDER_MIN_SCORE_GAIN = 0.15
+RENDER_MIN_TEXT_GAIN = 1.5
+
 def extract_and_clean_content(soup: BeautifulSoup) -> str:
     """Intelligently extracts and cleans the main content from a BeautifulSoup object."""
     main_content = None
-    selectors = ['main', 'article', '#content', '#main', '.content', '.main-content']
-    for selector in selectors:
+    for selector in MAIN_CONTENT_SELECTORS:
         if soup.select_one(selector):
             main_content = soup.select_one(selector)
             break
@@ -64,6 +75,133 @@ def choose_scraper_strategy(tech_report: dict) -> str:
     print("[STRATEGY] Standard website detected. Choosing STATIC scraper.")
     return 'static'
 
+def get_url_pattern(url: str) -> str:
+    """
+    Groups URLs that are likely served by the same template, so one render decision covers them all.
+    '/' stays on its own, top-level pages share '/*' and deeper pages share their first path segment.
+    """
+    parsed_url = urlparse(url)
+    segments = [seg for seg in parsed_url.path.split('/') if seg]
+    if not segments: return f"{parsed_url.netloc}/"
+    if len(segments) == 1: return f"{parsed_url.netloc}/*"
+    first = re.sub(r'\d+', ':id', segments[0])
+    return f"{parsed_url.netloc}/{first}/*"
+
+def visible_text_length(soup: BeautifulSoup) -> int:
+    """Length of the text a reader would see; strips scripts, styles and templates from the soup."""
+    for tag in soup.find_all(['script', 'style', 'noscript', 'template']):
+        tag.decompose()
+    body = soup.body or soup
+    return len(' '.join(body.get_text(separator=' ', strip=True).split()))
+
+def score_static_render(html: str) -> float:
+    """
+    Fast heuristic that scores how complete a statically fetched page is, from 0.0 (empty SPA shell)
+    to 1.0 (fully server-rendered). Looks at the text-to-markup ratio, whether a main content
+    selector holds real text, the size of the script payload and empty SPA mount points.
+    """
+    if not html: return 0.0
+
+    soup = BeautifulSoup(html, "html.parser")
+    script_tags = soup.find_all('script')
+    script_bytes = sum(len(tag.string or '') for tag in script_tags)
+    external_scripts = sum(1 for tag in script_tags if tag.get('src'))
+
+    text_len = visible_text_length(soup)
+
+    score = 0.0
+
+    # 1. Text-to-markup ratio: server-rendered pages are rarely below a few percent.
+    text_ratio = text_len / max(len(html), 1)
+    score += min(text_ratio / 0.05, 1.0) * 0.25
+
+    # 2. A main content container that actually holds text.
+    for selector in MAIN_CONTENT_SELECTORS:
+        main_content = soup.select_one(selector)
+        if main_content and len(main_content.get_text(strip=True)) >= 200:
+            score += 0.25
+            break
+
+    # 3. Enough visible text overall to be worth indexing.
+    score += min(text_len / 1500, 1.0) * 0.30
+
+    # 4. Script payload: heavy inline bundles or many external scripts point to client-side rendering.
+    if script_bytes < 50_000 and external_scripts < 15:
+        score += 0.20
+
+    # An empty framework mount point is a strong signal the page needs a browser.
+    for selector in SPA_ROOT_SELECTORS:
+        root = soup.select_one(selector)
+        if root is not None and len(root.get_text(strip=True)) < 50:
+            score *= 0.5
+            break
+
+    return round(score, 3)
+
+def is_render_richer(static_html: str, rendered_html: str) -> bool:
+    """True when the browser-rendered HTML holds clearly more content than a non-empty static HTML."""
+    if not rendered_html: return False
+    if score_static_render(rendered_html) - score_static_render(static_html) >= RENDER_MIN_SCORE_GAIN:
+        return True
+    static_text = visible_text_length(BeautifulSoup(static_html, "html.parser"))
+    rendered_text = visible_text_length(BeautifulSoup(rendered_html, "html.parser"))
+    return rendered_text >= max(static_text * RENDER_MIN_TEXT_GAIN, static_text + 200)
+
+def _render_dynamic(url: str, render_stats: dict) -> str:
+    render_stats["dynamic_renders"] += 1
+    # On a site the tech report called static, every browser render is one the old pipeline never made.
+    if render_stats["site_strategy"] == 'static':
+        render_stats["extra_renders"] += 1
+    return scrape_dynamic(url)
+
+def _keep_static(html: str, render_stats: dict) -> str:
+    render_stats["static_pages"] += 1
+    if render_stats["site_strategy"] == 'dynamic':
+        render_stats["renders_avoided"] += 1
+    return html
+
+def fetch_page_adaptive(url: str, render_stats: dict, render_decisions: dict) -> str:
+    """
+    Fetches a page statically first and only escalates to the browser when the HTML looks like
+    an empty shell. A pattern is only cached as 'dynamic' when the browser returned a complete page
+    that beats the static HTML; render_decisions holds the per-URL-pattern decisions of the current crawl.
+    """
+    pattern = get_url_pattern(url)
+    decision = render_decisions.get(pattern)
+    if decision == 'dynamic':
+        print(f"[RENDER] Cached decision for {pattern}: DYNAMIC.")
+        return _render_dynamic(url, render_stats)
+
+    html = scrape_static(url)
+    if not html:
+        # A failed static fetch (404, timeout, ...) says nothing about how the site renders:
+        # render this one page, but leave the pattern alone unless the browser got a complete page.
+        print(f"[RENDER] Static fetch failed for {url}. Trying the browser for this page only.")
+        rendered = _render_dynamic(url, render_stats)
+        if decision is None and score_static_render(rendered) >= RENDER_SCORE_THRESHOLD:
+            render_decisions[pattern] = 'dynamic'
+        return rendered
+
+    if decision == 'static':
+        return _keep_static(html, render_stats)
+
+    score = score_static_render(html)
+    if score >= RENDER_SCORE_THRESHOLD:
+        print(f"[RENDER] Static HTML is complete (score={score}). Skipping browser render.")
+        render_decisions[pattern] = 'static'
+        return _keep_static(html, render_stats)
+
+    print(f"[RENDER] Static HTML looks like an empty shell (score={score}). Escalating to DYNAMIC.")
+    rendered = _render_dynamic(url, render_stats)
+    if is_render_richer(html, rendered):
+        if score_static_render(rendered) >= RENDER_SCORE_THRESHOLD:
+            render_decisions[pattern] = 'dynamic'
+        return rendered
+
+    print(f"[RENDER] Browser render added no content for {url}. Keeping STATIC for {pattern}.")
+    render_decisions[pattern] = 'static'
+    return _keep_static(html, render_stats)
+
 def get_page_title_from_path(url: str, base_netloc: str) -> str:
     """Creates a clean title from the URL path."""
     parsed_url = urlparse(url)
@@ -72,6 +210,15 @@ def get_page_title_from_path(url: str, base_netloc: str) -> str:
     title = path.split('/')[-1]
     return title if title else "index"
 
+def remove_site(doc_id: str) -> bool:
+    """Deletes a scraped site: its vectors, precomputed answers, local JSON and database rows."""
+    delete_doc_from_index(doc_id)
+    invalidate_suggestions(doc_id)
+    file_path = os.path.join(DATA_FOLDER, f"{doc_id}.json")
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    return delete_document(doc_id)
+
 def scrape_and_process_site(start_url: str, doc_id: str, session_id: str):
     """
     The complete, robust pipeline with corrected database logic.
@@ -79,6 +226,7 @@ def scrape_and_process_site(start_url: str, doc_id: str, session_id: str):
     try:
         # --- STEP 1: Create placeholder records in the CORRECT order ---
         print("[PIPELINE] Creating initial placeholder records...")
+        invalidate_suggestions(doc_id)
         upsert_document(doc_id=doc_id, website_url=start_url, content_data={})
         create_initial_session(doc_id, session_id)
 
@@ -88,12 +236,20 @@ def scrape_and_process_site(start_url: str, doc_id: str, session_id: str):
         if not base_netloc: raise ValueError("Invalid URL provided.")
         
         initial_technologies = analyze_technology(start_url)
+        # The site-wide strategy is only the baseline now: each page is fetched statically first
+        # and escalated to the browser on its own, so we can report the renders it saved.
         strategy = choose_scraper_strategy(initial_technologies)
 
+        render_stats = {
+            "site_strategy": strategy, "static_pages": 0, "dynamic_renders": 0,
+            "renders_avoided": 0, "extra_renders": 0
+        }
+        render_decisions = {}
+
         final_output = {
             "doc_id": doc_id, "website_url": f"{parsed_start_url.scheme}://{base_netloc}",
             "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
-            "technologies": initial_technologies, "pages": []
+            "technologies": initial_technologies, "render_stats": render_stats, "pages": []
         }
         
         visited = set()
@@ -105,15 +261,16 @@ def scrape_and_process_site(start_url: str, doc_id: str, session_id: str):
             visited.add(current_url)
             print(f"[CRAWL] Scraping page: {current_url}")
 
-            html = scrape_dynamic(current_url) if strategy == 'dynamic' else scrape_static(current_url)
+            html = fetch_page_adaptive(current_url, render_stats, render_decisions)
             if not html: continue
 
             soup = BeautifulSoup(html, "html.parser")
             content = extract_and_clean_content(soup)
             title = get_page_title_from_path(current_url, base_netloc)
+            headings = [h.get_text(' ', strip=True) for h in soup.find_all(['h1', 'h2'])][:10]
             
             if content:
-                final_output["pages"].append({"title": title, "url": current_url, "content": content})
+                final_output["pages"].append({"title": title, "url": current_url, "headings": headings, "content": content})
 
             links = set()
             for a_tag in soup.find_all("a", href=True):
@@ -124,9 +281,14 @@ def scrape_and_process_site(start_url: str, doc_id: str, session_id: str):
             for link in links:
                 if link not in visited: queue.append(link)
 
+        print(f"[PIPELINE] Rendering: {render_stats['static_pages']} static, "
+              f"{render_stats['dynamic_renders']} dynamic, {render_stats['renders_avoided']} browser renders avoided, "
+              f"{render_stats['extra_renders']} extra.")
+
         # --- STEP 3: Save results and finalize status ---
         if final_output["pages"]:
             print("[PIPELINE] Scrape successful. Saving results...")
+            attach_suggested_questions(final_output)
             
             os.makedirs(DATA_FOLDER, exist_ok=True)
             file_path = os.path.join(DATA_FOLDER, f"{doc_id}.json")
@@ -140,6 +302,10 @@ def scrape_and_process_site(start_url: str, doc_id: str, session_id: str):
             rag_ready = prepare_retriever_for_doc(doc_id)
 
             update_session_status(session_id, 'ready' if rag_ready else 'failed')
+
+            # --- STEP 4 (optional): Precompute answers to suggested questions in the background ---
+            if rag_ready:
+                schedule_precompute(doc_id, final_output)
         else:
             print("[PIPELINE] No pages were scraped. Marking as failed.")
             update_session_status(session_id, 'failed')
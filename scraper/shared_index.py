@@ -0,0 +1,164 @@
+import os
+import copy
+import pickle
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+
+# Compact once this fraction of the stored vectors belongs to deleted documents.
+COMPACTION_THRESHOLD = 0.2
+
+class SharedVectorIndex:
+    """
+    A single FAISS store shared by many documents. Every chunk carries its doc_id in metadata,
+    searches are restricted to the requested documents with a FAISS ID selector, and deleted
+    documents are tombstoned until the next compaction.
+    """
+
+    def __init__(self, embeddings, vectorstore: Optional[FAISS] = None, tombstones: Optional[set] = None):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.tombstones = set(tombstones or ())
+        self.doc_positions: Dict[str, List[int]] = {}
+        self._lock = threading.RLock()
+        self._rebuild_positions()
+
+    def _rebuild_positions(self):
+        """Maps each doc_id to the FAISS positions of its chunks."""
+        self.doc_positions = {}
+        if self.vectorstore is None:
+            return
+        for position, docstore_id in self.vectorstore.index_to_docstore_id.items():
+            chunk = self.vectorstore.docstore.search(docstore_id)
+            doc_id = chunk.metadata.get("doc_id") if isinstance(chunk, Document) else None
+            if doc_id:
+                self.doc_positions.setdefault(doc_id, []).append(position)
+        for positions in self.doc_positions.values():
+            positions.sort()
+
+    def contains(self, doc_id: str) -> bool:
+        return doc_id in self.doc_positions and doc_id not in self.tombstones
+
+    def add_document(self, doc_id: str, chunks: List[Document]):
+        """Adds the chunks of one document, replacing any existing copy of it first."""
+        with self._lock:
+            if doc_id in self.doc_positions:
+                self.tombstones.add(doc_id)
+                self.compact()
+            for chunk in chunks:
+                chunk.metadata["doc_id"] = doc_id
+            if self.vectorstore is None:
+                first_position = 0
+                self.vectorstore = FAISS.from_documents(chunks, self.embeddings)
+            else:
+                first_position = self.vectorstore.index.ntotal
+                self.vectorstore.add_documents(chunks)
+            # New vectors are appended, so the document occupies one contiguous ID range.
+            self.doc_positions[doc_id] = list(range(first_position, self.vectorstore.index.ntotal))
+
+    def delete_document(self, doc_id: str):
+        """Tombstones a document; its vectors are only removed on the next compaction."""
+        with self._lock:
+            if doc_id not in self.doc_positions:
+                return
+            self.tombstones.add(doc_id)
+            if self.tombstoned_fraction() >= COMPACTION_THRESHOLD:
+                self.compact()
+
+    def tombstoned_fraction(self) -> float:
+        total = self.vectorstore.index.ntotal if self.vectorstore is not None else 0
+        if not total:
+            return 0.0
+        dead = sum(len(self.doc_positions.get(doc_id, ())) for doc_id in self.tombstones)
+        return dead / total
+
+    def compact(self):
+        """Physically removes the vectors of all tombstoned documents."""
+        with self._lock:
+            if self.vectorstore is None or not self.tombstones:
+                self.tombstones.clear()
+                return
+            dead_ids = [
+                self.vectorstore.index_to_docstore_id[position]
+                for doc_id in self.tombstones
+                for position in self.doc_positions.get(doc_id, ())
+            ]
+            if dead_ids:
+                self.vectorstore.delete(dead_ids)
+            print(f"[SHARED_INDEX] Compacted {len(dead_ids)} vectors from {len(self.tombstones)} deleted documents.")
+            self.tombstones.clear()
+            self._rebuild_positions()
+
+    def _build_selector(self, doc_ids: List[str]):
+        """Uses an ID-range selector when the targets are one contiguous block, a batch selector otherwise."""
+        positions = sorted(
+            position
+            for doc_id in set(doc_ids) if self.contains(doc_id)
+            for position in self.doc_positions[doc_id]
+        )
+        if not positions:
+            return None, 0
+        if positions[-1] - positions[0] + 1 == len(positions):
+            return faiss.IDSelectorRange(positions[0], positions[-1] + 1), len(positions)
+        return faiss.IDSelectorBatch(np.array(positions, dtype=np.int64)), len(positions)
+
+    def search(self, question: str, doc_ids: List[str], k: int = 4) -> List[Document]:
+        """Returns the k chunks closest to the question, restricted to the given documents."""
+        with self._lock:
+            if self.vectorstore is None:
+                return []
+            selector, candidates = self._build_selector(doc_ids)
+            if selector is None:
+                return []
+            query = np.array([self.embeddings.embed_query(question)], dtype=np.float32)
+            params = faiss.SearchParameters(sel=selector)
+            _, indices = self.vectorstore.index.search(query, min(k, candidates), params=params)
+            results = []
+            for position in indices[0]:
+                if position == -1:
+                    continue
+                docstore_id = self.vectorstore.index_to_docstore_id[int(position)]
+                results.append(self.vectorstore.docstore.search(docstore_id))
+            return results
+
+    def save(self, path: str):
+        """Pickles the index under its lock to a temp file and swaps it into place atomically."""
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self, f)
+            os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        return {
+            "documents": sum(1 for doc_id in self.doc_positions if doc_id not in self.tombstones),
+            "vectors": self.vectorstore.index.ntotal if self.vectorstore is not None else 0,
+            "tombstoned_documents": len(self.tombstones),
+        }
+
+    def attach_embeddings(self, embeddings):
+        """Re-attaches the embedding model after unpickling; the pickle never contains it."""
+        self.embeddings = embeddings
+        if self.vectorstore is not None:
+            self.vectorstore.embedding_function = embeddings
+
+    def __getstate__(self):
+        # Leave the embedding model out of the pickle: it would store a full copy of the model
+        # weights and, once loaded, keep a second model in memory next to the shared one.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["doc_positions"]
+        state["embeddings"] = None
+        if self.vectorstore is not None:
+            state["vectorstore"] = copy.copy(self.vectorstore)
+            state["vectorstore"].embedding_function = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._rebuild_positions()
@@ -0,0 +1,173 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from scraper.rag_handler import ask_question
+from scraper.supabase_manager import get_document_content, upsert_document
+
+# Set PRECOMPUTE_SUGGESTIONS=false to skip the post-ingest stage entirely.
+PRECOMPUTE_ENABLED = os.environ.get("PRECOMPUTE_SUGGESTIONS", "true").lower() not in ("0", "false", "no")
+MAX_SUGGESTED_QUESTIONS = 6
+GENERIC_TOPICS = {"home", "index", "menu", "search", "login", "sign in", "sign up", "cart", "404"}
+
+# Precomputed answers per doc_id: {"scraped_at": ..., "questions": [...], "answers": {normalized_question: answer}}
+SUGGESTION_CACHE: Dict[str, dict] = {}
+
+# Precomputation only sends a generation to Ollama once no live question has run for this long.
+PRECOMPUTE_IDLE_SECONDS = 30
+
+# A single worker, so precomputation never runs more than one generation at a time.
+PRECOMPUTE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute")
+
+# Live /chat RAG calls in flight and when the last one (or the last ingest) finished.
+_live_questions = 0
+_last_activity = float("-inf")
+_activity = threading.Condition()
+
+@contextmanager
+def live_question():
+    """Wraps a live RAG call so precomputation yields Ollama to it."""
+    global _live_questions, _last_activity
+    with _activity:
+        _live_questions += 1
+    try:
+        yield
+    finally:
+        with _activity:
+            _live_questions -= 1
+            _last_activity = time.monotonic()
+            _activity.notify_all()
+
+def _mark_activity():
+    global _last_activity
+    with _activity:
+        _last_activity = time.monotonic()
+
+def _wait_until_idle():
+    """Blocks until no live question is in flight and none has finished for PRECOMPUTE_IDLE_SECONDS."""
+    with _activity:
+        while True:
+            if _live_questions:
+                _activity.wait()
+                continue
+            idle_for = time.monotonic() - _last_activity
+            if idle_for >= PRECOMPUTE_IDLE_SECONDS:
+                return
+            _activity.wait(PRECOMPUTE_IDLE_SECONDS - idle_for)
+
+def normalize_question(question: str) -> str:
+    return question.lower().strip().rstrip("?!.")
+
+def _topic_from_title(title: str) -> str:
+    return title.replace('-', ' ').replace('_', ' ').strip()
+
+def derive_suggested_questions(content: dict, limit: int = MAX_SUGGESTED_QUESTIONS) -> List[str]:
+    """Derives likely first questions for a site from its page headings and titles."""
+    questions = []
+    site = urlparse(content.get("website_url", "")).netloc
+    if site:
+        questions.append(f"What does {site} do?")
+
+    seen = set()
+    topics = []
+    pages = content.get("pages", [])
+    for page in pages:
+        topics.extend(page.get("headings", []))
+    for page in pages:
+        topics.append(_topic_from_title(page.get("title", "")))
+
+    for topic in topics:
+        topic = ' '.join(topic.split()).strip(" :-|")
+        key = topic.lower()
+        if len(topic) < 4 or len(topic.split()) > 8:
+            continue
+        if key in seen or key in GENERIC_TOPICS:
+            continue
+        seen.add(key)
+        questions.append(f"What can you tell me about {topic}?")
+        if len(questions) >= limit:
+            break
+    return questions
+
+def attach_suggested_questions(content: dict):
+    """Stores the derived questions, without answers yet, alongside the document content."""
+    content["suggestions"] = {
+        "scraped_at": content.get("timestamp"),
+        "items": [{"question": q, "answer": None} for q in derive_suggested_questions(content)],
+    }
+
+def invalidate_suggestions(doc_id: str):
+    """Drops any precomputed answers for a document, e.g. when it is re-scraped."""
+    SUGGESTION_CACHE.pop(doc_id, None)
+
+def _cache_entry(suggestions: dict) -> dict:
+    items = suggestions.get("items", [])
+    return {
+        "scraped_at": suggestions.get("scraped_at"),
+        "questions": [item["question"] for item in items],
+        "answers": {normalize_question(item["question"]): item["answer"] for item in items if item.get("answer")},
+    }
+
+def _load_suggestions(doc_id: str) -> dict:
+    """Reads suggestions from memory, falling back to the stored document once per doc_id."""
+    if doc_id in SUGGESTION_CACHE:
+        return SUGGESTION_CACHE[doc_id]
+    content = get_document_content(doc_id) or {}
+    suggestions = content.get("suggestions") or {}
+    if suggestions.get("scraped_at") != content.get("timestamp"):
+        suggestions = {}
+    # Cached even when empty or incomplete; the background job refreshes the entry when it finishes.
+    SUGGESTION_CACHE[doc_id] = _cache_entry(suggestions)
+    return SUGGESTION_CACHE[doc_id]
+
+def get_suggestions(doc_id: str) -> List[dict]:
+    """Returns the suggested questions for a document and whether an instant answer is ready."""
+    entry = _load_suggestions(doc_id)
+    return [{"question": q, "ready": normalize_question(q) in entry["answers"]} for q in entry["questions"]]
+
+def get_instant_answer(doc_id: str, question: str) -> Optional[str]:
+    """Returns the precomputed answer if the question matches a suggested one."""
+    entry = _load_suggestions(doc_id)
+    return entry["answers"].get(normalize_question(question))
+
+def precompute_answers(doc_id: str, content: dict):
+    """Runs retrieval and generation for every suggested question and stores the answers with the document."""
+    suggestions = content.get("suggestions")
+    if not suggestions:
+        return
+    scraped_at = suggestions.get("scraped_at")
+    print(f"[PRECOMPUTE] Answering {len(suggestions['items'])} suggested questions for doc_id {doc_id}...")
+
+    for item in suggestions["items"]:
+        # Checked before every generation, so a live question waits for at most one precomputed answer.
+        _wait_until_idle()
+        try:
+            item["answer"] = ask_question(doc_id=doc_id, question=item["question"], history=[])
+        except Exception as e:
+            print(f"[PRECOMPUTE_ERROR] Failed to answer '{item['question']}': {e}")
+
+    # A re-scrape may have replaced the content while we were generating; never store stale answers.
+    stored = get_document_content(doc_id)
+    if not stored or stored.get("timestamp") != scraped_at:
+        print(f"[PRECOMPUTE] Document {doc_id} changed during precomputation. Discarding answers.")
+        return
+
+    content["suggestions"] = suggestions
+    upsert_document(doc_id, content.get("website_url", ""), content)
+    SUGGESTION_CACHE[doc_id] = _cache_entry(suggestions)
+    print(f"[PRECOMPUTE] Instant answers for doc_id {doc_id} are ready.")
+
+def schedule_precompute(doc_id: str, content: dict):
+    """
+    Serves the suggested questions right away and queues their answers on the background worker.
+    The session has just turned 'ready', so the first live question gets a head start.
+    """
+    SUGGESTION_CACHE[doc_id] = _cache_entry(content.get("suggestions") or {})
+    if not PRECOMPUTE_ENABLED or not SUGGESTION_CACHE[doc_id]["questions"]:
+        return
+    _mark_activity()
+    PRECOMPUTE_POOL.submit(precompute_answers, doc_id, content)
@@ -1,10 +1,19 @@
-from config import supabase
+from config import get_supabase
 from typing import List, Dict
 
+def ping_database() -> bool:
+    """Runs a minimal query to check that the database is reachable."""
+    try:
+        get_supabase().table('sessions').select('session_id').limit(1).execute()
+        return True
+    except Exception as e:
+        print(f"[DB_ERROR] Database is not reachable: {e}")
+        return False
+
 def get_all_sessions():
     """Fetches all sessions from the database, including their status."""
     try:
-        response = supabase.table('sessions').select(
+        response = get_supabase().table('sessions').select(
             'session_id, doc_id, created_at, conversation, status, documents(website_url)'
         ).order('created_at', desc=True).execute()
         return response
@@ -15,7 +24,7 @@ def get_all_sessions():
 def update_session_status(session_id: str, status: str):
     """Updates the status of a session (e.g., 'ready' or 'failed')."""
     try:
-        supabase.table('sessions').update({'status': status}).eq('session_id', session_id).execute()
+        get_supabase().table('sessions').update({'status': status}).eq('session_id', session_id).execute()
         print(f"[DB] Session {session_id} status updated to '{status}'.")
     except Exception as e:
         print(f"[DB_ERROR] Failed to update session status: {e}")
@@ -23,7 +32,7 @@ def update_session_status(session_id: str, status: str):
 def update_conversation(session_id: str, conversation_history: List[str]):
     """Updates the conversation history for a given session."""
     try:
-        response = supabase.table('sessions').update({
+        response = get_supabase().table('sessions').update({
             'conversation': conversation_history
         }).eq('session_id', session_id).execute()
         return response
@@ -37,7 +46,7 @@ def upsert_document(doc_id: str, website_url: str, content_data: Dict):
     This is key to creating a placeholder and then updating it with content.
     """
     try:
-        response = supabase.table('documents').upsert({
+        response = get_supabase().table('documents').upsert({
             'doc_id': doc_id,
             'website_url': website_url,
             'content': content_data
@@ -47,10 +56,30 @@ def upsert_document(doc_id: str, website_url: str, content_data: Dict):
         print(f"[DB_ERROR] Failed to upsert document: {e}")
         return None
 
+def get_document_content(doc_id: str):
+    """Fetches the stored content JSON of a document, or None if it is missing."""
+    try:
+        response = get_supabase().table('documents').select('content').eq('doc_id', doc_id).single().execute()
+        return response.data.get('content') if response.data else None
+    except Exception as e:
+        print(f"[DB_ERROR] Failed to fetch document content: {e}")
+        return None
+
+def delete_document(doc_id: str) -> bool:
+    """Deletes a document and all sessions that chat with it."""
+    try:
+        get_supabase().table('sessions').delete().eq('doc_id', doc_id).execute()
+        get_supabase().table('documents').delete().eq('doc_id', doc_id).execute()
+        print(f"[DB] Document {doc_id} and its sessions deleted.")
+        return True
+    except Exception as e:
+        print(f"[DB_ERROR] Failed to delete document: {e}")
+        return False
+
 def create_initial_session(doc_id: str, session_id: str):
     """Creates an initial session with a 'processing' status."""
     try:
-        response = supabase.table('sessions').insert({
+        response = get_supabase().table('sessions').insert({
             'doc_id': doc_id,
             'session_id': session_id,
             'conversation': [],
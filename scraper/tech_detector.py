@@ -1,6 +1,4 @@
 import warnings
-from Wappalyzer import Wappalyzer, WebPage
-import builtwith
 
 warnings.filterwarnings("ignore", category=UserWarning, module='Wappalyzer')
 
@@ -8,6 +6,10 @@ def analyze_technology(url: str) -> dict:
     """
     Analyzes a URL's technology and returns a simplified dictionary of key technologies.
     """
+    # Wappalyzer loads its full fingerprint database on import, so only pay for it when scraping.
+    from Wappalyzer import Wappalyzer, WebPage
+    import builtwith
+
     print(f"[INFO] Analyzing technologies for: {url}")
     technologies = set()
     